@@ -1,15 +1,18 @@
 import logging
-import asyncio
+from typing import Final
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_OUTPUT_PORTS
+from .const import DOMAIN, DEFAULT_HOST, DEFAULT_PORT
+from .coordinator import KvmCoordinator
 from .kvm_client import KvmClient
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = ["select"]
+PLATFORMS: Final = ("select",)
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     hass.data[DOMAIN] = {}
@@ -18,19 +21,21 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     host = entry.data.get("host", DEFAULT_HOST)
     port = entry.data.get("port", DEFAULT_PORT)
-    output_ports = DEFAULT_OUTPUT_PORTS
 
     # 创建KVM客户端
     client = KvmClient(hass.loop, host, port)
-    await client.connect()
+    if not await client.connect():
+        # 由HA稍后重试设置，客户端只在连接建立后才会自动重连
+        raise ConfigEntryNotReady(f"Unable to connect to KVM at {host}:{port}")
+
+    # 所有实体共用一个协调器，每个周期只向KVM查询一次全部端口，并分发KVM主动上报的状态
+    coordinator = KvmCoordinator(hass, client)
 
     # 立即获取所有端口的初始状态，确保重启后状态正确
     _LOGGER.info("🔍 Initializing all port statuses after connection")
-    for port in range(1, DEFAULT_OUTPUT_PORTS + 1):
-        _LOGGER.info(f"📋 Getting initial status for Output {port}")
-        await client.get_current_status(port)
+    await coordinator.async_config_entry_first_refresh()
 
-    hass.data[DOMAIN][entry.entry_id] = client
+    hass.data[DOMAIN][entry.entry_id] = {"client": client, "coordinator": coordinator}
 
     # 设置平台
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -38,14 +43,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    unload_ok = all(
-        await asyncio.gather(
-            *[hass.config_entries.async_forward_entry_unload(entry, platform) for platform in PLATFORMS]
-        )
-    )
+    # 由HA统一卸载所有平台，无需为每个平台单独调度任务
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        client = hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        client = data["client"]
+        # 先解除协调器的监听，断开连接时不再通知已卸载的协调器
+        client.set_status_listener(None)
+        client.set_connection_listener(None)
         await client.disconnect()
 
     return unload_ok
\ No newline at end of file
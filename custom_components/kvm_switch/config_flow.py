@@ -5,8 +5,7 @@ from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
-from .const import DOMAIN, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_OUTPUT_PORTS
-from .kvm_client import KvmClient
+from .const import DOMAIN, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_OUTPUT_PORTS, PROBE_TIMEOUT
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,11 +22,19 @@ class KvmSwitchConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             port = user_input["port"]
             output_ports = user_input.get("output_ports", DEFAULT_OUTPUT_PORTS)
 
-            # 测试连接
-            client = KvmClient(self.hass.loop, host, port)
-            connected = await client.connect()
+            # 测试连接: 只做一次带超时的TCP探测，不创建完整的客户端
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(host, port), timeout=PROBE_TIMEOUT
+                )
+                writer.close()
+                await writer.wait_closed()
+                connected = True
+            except (OSError, asyncio.TimeoutError) as e:
+                _LOGGER.error(f"❌ Failed to connect to KVM at {host}:{port}: {e}")
+                connected = False
+
             if connected:
-                await client.disconnect()
                 return self.async_create_entry(
                     title="KVM Switch",
                     data={
@@ -1,10 +1,14 @@
 import logging
+from datetime import timedelta
 
 DOMAIN = "kvm_switch"
 DEFAULT_NAME = "KVM Switch"
 DEFAULT_HOST = "10.0.0.10"
 DEFAULT_PORT = 1110
 DEFAULT_OUTPUT_PORTS = 4
+CONNECT_TIMEOUT = 5  # 建立KVM连接的超时(秒)
+PROBE_TIMEOUT = 3  # 配置流程中连接测试的超时(秒)
+SCAN_INTERVAL = timedelta(seconds=30)  # 协调器轮询所有端口状态的间隔
 
 # 常量定义
 KVM_SWITCH_MIN_PORT = 1
@@ -16,4 +20,40 @@ KVM_SWITCH_MAX_INPUT = 4
 STATUS_INITIALIZING = "initializing"
 STATUS_CONNECTED = "connected"
 STATUS_DISCONNECTED = "disconnected"
-STATUS_ERROR = "error"
\ No newline at end of file
+STATUS_ERROR = "error"
+
+# 输入源名称，按设备代码(0-3)直接索引
+INPUT_NAMES = ("IN1", "IN2", "IN3", "IN4")
+
+# 切换命令: (输出端口, 输入源) -> 原始命令字节 (模块加载时构建一次)
+COMMAND_BYTES = {
+    (1, 1): b'cir 00\r\n',
+    (1, 2): b'cir 01\r\n',
+    (1, 3): b'cir 02\r\n',
+    (1, 4): b'cir 03\r\n',
+    (2, 1): b'cir 08\r\n',
+    (2, 2): b'cir 09\r\n',
+    (2, 3): b'cir 0a\r\n',
+    (2, 4): b'cir 0b\r\n',
+    (3, 1): b'cir 10\r\n',
+    (3, 2): b'cir 11\r\n',
+    (3, 3): b'cir 12\r\n',
+    (3, 4): b'cir 13\r\n',
+    (4, 1): b'cir 18\r\n',
+    (4, 2): b'cir 19\r\n',
+    (4, 3): b'cir 1a\r\n',
+    (4, 4): b'cir 1b\r\n',
+}
+
+# 安全检测命令: 输出端口 -> (减, 加)，两条命令发完后输入源回到原状态
+PROBE_COMMAND_BYTES = {
+    1: (b'cir 1d\r\n', b'cir 1e\r\n'),
+    2: (b'cir 05\r\n', b'cir 06\r\n'),
+    3: (b'cir 0d\r\n', b'cir 0e\r\n'),
+}
+
+# 输出4只加一次，再用切换命令恢复原输入源
+OUTPUT4_INCREASE_BYTES = b'cir 16\r\n'
+
+# 直接查询命令: 与切换到IN1的命令相同
+QUERY_COMMAND_BYTES = {output: COMMAND_BYTES[(output, 1)] for output in range(1, DEFAULT_OUTPUT_PORTS + 1)}
\ No newline at end of file
@@ -0,0 +1,70 @@
+import logging
+from typing import Callable, Dict
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import DOMAIN, SCAN_INTERVAL
+from .kvm_client import KvmClient
+
+_LOGGER = logging.getLogger(__name__)
+
+class KvmCoordinator(DataUpdateCoordinator):
+    """Polls all output statuses and fans the KVM's pushed reports out to the entities"""
+
+    def __init__(self, hass: HomeAssistant, client: KvmClient):
+        """Initialize the coordinator and take over the client's status listener"""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=SCAN_INTERVAL,
+            # Don't notify entities when the status dict is unchanged
+            always_update=False,
+        )
+        self.client = client
+        self._port_handlers: Dict[int, Callable[[str], None]] = {}
+
+        # A single listener on the client, dispatched here by output port
+        client.set_status_listener(self._dispatch_status)
+        # Entities re-read their availability when the connection goes up or down
+        client.set_connection_listener(self._connection_changed)
+
+    async def _async_update_data(self) -> Dict[int, int]:
+        """Fetch the status of every output, failing while the KVM is disconnected"""
+        try:
+            return await self.client.get_all_statuses()
+        except ConnectionError as err:
+            # Marks the update as failed, CoordinatorEntity availability follows last_update_success
+            raise UpdateFailed(str(err)) from err
+
+    @callback
+    def async_add_port_listener(self, output_port: int, handler: Callable[[str], None]) -> Callable[[], None]:
+        """Route pushed status reports for output port to handler, returns the function removing it"""
+        self._port_handlers[output_port] = handler
+
+        @callback
+        def remove_listener():
+            if self._port_handlers.get(output_port) == handler:
+                del self._port_handlers[output_port]
+
+        return remove_listener
+
+    @callback
+    def _dispatch_status(self, output_port: int, device_code: str):
+        """Hand a pushed status report to the entity for its output port"""
+        handler = self._port_handlers.get(output_port)
+        if handler is not None:
+            handler(device_code)
+
+    @callback
+    def _connection_changed(self, connected: bool):
+        """Let the entities update their availability after the connection went up or down"""
+        _LOGGER.debug("🔌 KVM connection %s, updating entities", "up" if connected else "down")
+        self.async_update_listeners()
+
+        # Polls fail without probing while the link is down, so refresh as soon as it is back
+        # instead of staying unavailable until the next scheduled poll. Only the first poll after a
+        # connect sends commands, probing each output once; later polls just read the cache
+        if connected:
+            self.hass.async_create_task(self.async_request_refresh())
@@ -1,13 +1,25 @@
 import logging
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, DEFAULT_OUTPUT_PORTS
+from .const import DOMAIN, DEFAULT_OUTPUT_PORTS, INPUT_NAMES
 
 _LOGGER = logging.getLogger(__name__)
 
+# Status reports arriving within this window (seconds) are written to Home Assistant once
+_WRITE_COOLDOWN = 0.1
+
+# Device code reported by the client (0-3) -> option, and option -> input source (1-4)
+_CODE_TO_OPTION = {str(code): name for code, name in enumerate(INPUT_NAMES)}
+_OPTION_TO_SOURCE = {name: code + 1 for code, name in enumerate(INPUT_NAMES)}
+
+# Shared by every entity, SelectEntity declares options as list[str]; membership checks go through _OPTION_TO_SOURCE
+_OPTIONS = list(INPUT_NAMES)
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -16,24 +28,26 @@ async def async_setup_entry(
     """Set up KVM Select entities from a config entry"""
     _LOGGER.info("🔧 Setting up KVM Select entities from config entry")
     
-    # Get the client from the hass data
-    client = hass.data[DOMAIN][entry.entry_id]
+    # Get the client and the shared status coordinator from the hass data
+    data = hass.data[DOMAIN][entry.entry_id]
+    client = data["client"]
+    coordinator = data["coordinator"]
     
     # Create entities for each output port (1-4)
     entities = []
     for port in range(1, DEFAULT_OUTPUT_PORTS + 1):
-        entities.append(KvmSelect(client, port))
+        entities.append(KvmSelect(coordinator, client, port))
     
-    # Add entities to Home Assistant
-    async_add_entities(entities, True)
-    _LOGGER.info(f"✅ Added {len(entities)} KVM Select entities")
+    # Add entities to Home Assistant, the coordinator already holds their initial status
+    async_add_entities(entities)
+    _LOGGER.info("✅ Added %s KVM Select entities", len(entities))
 
-class KvmSelect(SelectEntity):
+class KvmSelect(CoordinatorEntity, SelectEntity):
     """KVM Switch Select Entity for Home Assistant"""
     
-    def __init__(self, client, output_port):
+    def __init__(self, coordinator, client, output_port):
         """Initialize the KVM Select entity"""
-        super().__init__()
+        super().__init__(coordinator)
         
         # Client and port information
         self.client = client
@@ -42,148 +56,142 @@ class KvmSelect(SelectEntity):
         # Entity attributes
         self._attr_name = f"OUT{output_port} Source"
         self._attr_unique_id = f"kvm_select_out{output_port}"
-        self._attr_options = ["IN1", "IN2", "IN3", "IN4"]
-        self._attr_current_option = None
+        self._attr_options = _OPTIONS
+        current_input = coordinator.data.get(output_port) if coordinator.data else None
+        self._attr_current_option = f"IN{current_input}" if current_input is not None else None
         self._attr_icon = "mdi:video-input-hdmi"
+        self._attr_available = self._compute_available()
         
         # State management
-        self._initialized = False
-        self._update_pending = False
+        self._write_debouncer = None
+        self._pending_option = None
         
-        # Register status update callback
-        self.client.register_callback(str(output_port), self._handle_status_update)
-        
-        _LOGGER.info(f"🔧 Created KVM Select entity for Output {output_port}")
+        _LOGGER.info("🔧 Created KVM Select entity for Output %s", output_port)
     
     async def async_added_to_hass(self):
         """Called when entity is added to Home Assistant"""
         await super().async_added_to_hass()
-        _LOGGER.info(f"📥 Entity added to HASS: {self.name}")
+        _LOGGER.info("📥 Entity added to HASS: %s", self.name)
         
-        # Mark entity as initialized
-        self._initialized = True
+        # Apply the first report of a burst right away and coalesce the rest into one state write
+        self._write_debouncer = Debouncer(
+            self.hass,
+            _LOGGER,
+            cooldown=_WRITE_COOLDOWN,
+            immediate=True,
+            function=self._flush_state,
+        )
         
-        # Get initial state
-        await self.async_update()
+        # Receive pushed status reports for this output until the entity is removed
+        # (the initial state came from the coordinator and is written by the platform)
+        self.async_on_remove(
+            self.coordinator.async_add_port_listener(self._output_port, self._handle_status_update)
+        )
     
     async def async_will_remove_from_hass(self):
         """Called when entity is about to be removed from Home Assistant"""
         await super().async_will_remove_from_hass()
-        _LOGGER.info(f"📤 Entity will be removed from HASS: {self.name}")
+        _LOGGER.info("📤 Entity will be removed from HASS: %s", self.name)
+        if self._write_debouncer is not None:
+            self._write_debouncer.async_cancel()
     
-    async def async_update(self):
-        """Update entity state from KVM switch with protection against overloading"""
-        _LOGGER.info(f"🔄 Updating entity: {self.name}")
+    @callback
+    def _handle_coordinator_update(self):
+        """Apply the statuses fetched by the shared coordinator and the current connection state"""
+        available = self._compute_available()
+        available_changed = available != self._attr_available
+        self._attr_available = available
         
-        # Prevent concurrent updates
-        if self._update_pending:
-            _LOGGER.debug(f"🔒 Update already pending for {self.name}, skipping")
-            return
+        current_input = self.coordinator.data.get(self._output_port)
+        if current_input is None:
+            # If no status available, don't clear existing state - keep last known good state
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("📋 No status for %s in coordinator data, keeping %s", self.name, self._attr_current_option)
+        else:
+            new_option = f"IN{current_input}"
+            old_option = self._attr_current_option
+            if self._set_option_if_changed(new_option):
+                _LOGGER.info("📊 State updated for %s: %s → %s", self.name, old_option, new_option)
+                return
         
-        self._update_pending = True
-        
-        try:
-            # Get current status from client with retries handled by client
-            current_input = await self.client.get_current_status(self._output_port)
-            
-            if current_input is not None:
-                new_option = f"IN{current_input}"
-                
-                # Only update if the state has changed
-                if self._attr_current_option != new_option:
-                    old_option = self._attr_current_option
-                    self._attr_current_option = new_option
-                    
-                    _LOGGER.info(f"📊 State updated for {self.name}: {old_option} → {new_option}")
-                    
-                    # Write state to Home Assistant if entity is initialized
-                    if self._initialized and self.hass:
-                        self.async_write_ha_state()
-                else:
-                    _LOGGER.info(f"📋 State unchanged for {self.name}: {new_option}")
-            else:
-                _LOGGER.warning(f"⚠️  Failed to get status for {self.name}")
-                # If no status available, don't clear existing state - keep last known good state
-                if self._attr_current_option is None:
-                    _LOGGER.info(f"📋 No previous state for {self.name}, keeping as None")
-                else:
-                    _LOGGER.info(f"📋 Keeping last known state for {self.name}: {self._attr_current_option}")
-        finally:
-            # Ensure update pending flag is cleared
-            self._update_pending = False
+        # The option write above already carries the availability, only write when nothing else did
+        if available_changed:
+            _LOGGER.info("🔌 %s is now %s", self.name, "available" if available else "unavailable")
+            self.async_write_ha_state()
+    
+    def _compute_available(self) -> bool:
+        """Available while the last poll succeeded and the KVM connection is up"""
+        return self.coordinator.last_update_success and self.client.connected
     
     async def async_select_option(self, option: str):
         """Handle option selection from Home Assistant"""
-        _LOGGER.info(f"🎯 Selecting option '{option}' for {self.name}")
+        _LOGGER.info("🎯 Selecting option '%s' for %s", option, self.name)
         
-        # Validate option
-        if option not in self._attr_options:
+        # Validate option and look up its input source (e.g., "IN2" -> 2)
+        input_source = _OPTION_TO_SOURCE.get(option)
+        if input_source is None:
             _LOGGER.error(f"❌ Invalid option '{option}' for {self.name}")
             return
         
-        try:
-            # Extract input source number from option (e.g., "IN2" -> 2)
-            input_source = int(option[2:])
-            _LOGGER.debug(f"🔢 Parsed input source: {input_source}")
-            
-            # Set the input source using the client
-            success = await self.client.set_input_source(self._output_port, input_source)
-            
-            if success:
-                # Update local state
-                old_option = self._attr_current_option
-                self._attr_current_option = option
-                
-                _LOGGER.info(f"✅ Successfully changed {self.name}: {old_option} → {option}")
-                
-                # Write state to Home Assistant
-                if self._initialized and self.hass:
-                    self.async_write_ha_state()
-            else:
-                _LOGGER.error(f"❌ Failed to change {self.name} to {option}")
-        except ValueError as e:
-            _LOGGER.error(f"❌ Invalid option format '{option}': {e}")
+        # Set the input source using the client
+        success = await self.client.set_input_source(self._output_port, input_source)
+        
+        if success:
+            # Update local state
+            old_option = self._attr_current_option
+            if self._set_option_if_changed(option):
+                _LOGGER.info("✅ Successfully changed %s: %s → %s", self.name, old_option, option)
+        else:
+            _LOGGER.error(f"❌ Failed to change {self.name} to {option}")
     
+    @callback
     def _handle_status_update(self, device_code: str):
-        """Handle status update from KVM client callback"""
-        _LOGGER.info(f"📣 Received status update via callback for {self.name}: device_code={device_code}")
-        
-        try:
-            # Convert device code (0-3) to input source (1-4)
-            input_code = int(device_code)
-            input_source = input_code + 1
-            new_option = f"IN{input_source}"
-            
-            _LOGGER.debug(f"🔢 Translated device_code {device_code} to input_source {input_source} ({new_option})")
-            
-            # Validate input source (1-4)
-            if 1 <= input_source <= 4:
-                # Only update if the state has changed
-                if self._attr_current_option != new_option:
-                    old_option = self._attr_current_option
-                    self._attr_current_option = new_option
-                    
-                    _LOGGER.info(f"📊 Updated state via callback for {self.name}: {old_option} → {new_option}")
-                    
-                    # Write state to Home Assistant if entity is initialized
-                    if self._initialized and self.hass:
-                        self.async_write_ha_state()
-                else:
-                    _LOGGER.debug(f"📋 Callback state unchanged for {self.name}: {new_option}")
-            else:
-                _LOGGER.warning(f"⚠️  Invalid input source from callback: {input_source} for {self.name}")
-        except ValueError as e:
-            _LOGGER.error(f"❌ Failed to parse device code '{device_code}' for {self.name}: {e}")
+        """Handle status update pushed by the KVM, dispatched by the coordinator"""
+        # Fires for every report the KVM sends, keep it at debug and skip resolving the name otherwise
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("📣 Received status update via callback for %s: device_code=%s", self.name, device_code)
+        
+        # Look up the option for device code (0-3), unknown codes map to None
+        new_option = _CODE_TO_OPTION.get(device_code)
+        if new_option is None:
+            _LOGGER.warning(f"⚠️  Invalid device code from callback: {device_code} for {self.name}")
+            return
+        
+        # Only the latest report matters, the debouncer decides when it is applied
+        self._pending_option = new_option
+        self._write_debouncer.async_schedule_call()
     
-    @property
-    def available(self):
-        """Return if entity is available"""
-        return self.client.connected
+    @callback
+    def _flush_state(self):
+        """Apply the latest option reported through the callback"""
+        new_option = self._pending_option
+        if new_option is None:
+            return
+        self._pending_option = None
+        
+        old_option = self._attr_current_option
+        if self._set_option_if_changed(new_option):
+            _LOGGER.info("📊 Updated state via callback for %s: %s → %s", self.name, old_option, new_option)
+        elif _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("📋 Callback state unchanged for %s: %s", self.name, new_option)
+    
+    def _set_option_if_changed(self, new_option: str) -> bool:
+        """Store a new option and write state only when it differs, return whether it changed"""
+        if self._attr_current_option == new_option:
+            return False
+        
+        self._attr_current_option = new_option
+        
+        # Write state to Home Assistant once the entity has been added
+        if self.hass is not None:
+            self.async_write_ha_state()
+        return True
     
     @property
-    def should_poll(self):
-        """Return if entity should be polled for updates"""
-        return True  # Enable polling to ensure consistent state
+    def available(self):
+        """Return if entity is available, kept up to date by _handle_coordinator_update"""
+        # CoordinatorEntity overrides available, so _attr_available has to be returned explicitly
+        return self._attr_available
     
     @property
     def device_info(self):